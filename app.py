@@ -1,6 +1,7 @@
 # -------------------------
 import streamlit as st
 import pandas as pd
+import numpy as np
 from datetime import datetime, date, timedelta
 import os
 import altair as alt
@@ -9,60 +10,147 @@ import altair as alt
 # CONFIG
 # -------------------------
 st.set_page_config(page_title="Membership Tracker — Business Edition", layout="wide")
-DATA_FILE = "members.csv"
+DATA_FILE = "members.parquet"
+LEGACY_DATA_FILE = "members.csv"
 PLANS_FILE = "plans.csv"
 DATE_FORMAT = "%Y-%m-%d"
+MEMBERS_PAGE_SIZE = 500
+MEMBER_SEARCH_LIMIT = 50
+# Arrow-backed strings: columnar storage, and str.contains/to_datetime run in Arrow compute
+MEMBER_TEXT_DTYPE = "string[pyarrow]"
 
 DEFAULT_PLANS = {"Bronze":3,"Silver":6,"Gold":9,"Platinum":12}
+STATUSES = ("Active","Expired","Unknown")
+MEMBER_COLUMNS = ("Member ID","Name","Email","Phone","Start Date","End Date","Plan Type","Status","Notes")
+# Everything but the free-text Notes; enough for the dashboard KPIs and charts
+SUMMARY_COLUMNS = tuple(c for c in MEMBER_COLUMNS if c != "Notes")
+# Dates are kept as datetime64 in memory; show them without a time part
+DATE_COLUMN_CONFIG = {
+    "Start Date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+    "End Date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+}
 
 # -------------------------
 # Utilities
 # -------------------------
 def ensure_files_exist():
     if not os.path.exists(DATA_FILE):
-        df = pd.DataFrame(columns=["Member ID","Name","Email","Phone","Start Date","End Date","Plan Type","Status","Notes"])
-        df.to_csv(DATA_FILE,index=False)
+        if os.path.exists(LEGACY_DATA_FILE):
+            # One-shot migration from the old CSV store
+            df = parse_member_dates(pd.read_csv(LEGACY_DATA_FILE,dtype=MEMBER_TEXT_DTYPE))
+        else:
+            df = pd.DataFrame(columns=list(MEMBER_COLUMNS))
+        save_members(df)
     if not os.path.exists(PLANS_FILE):
-        pd.DataFrame([{"Plan":p,"DurationMonths":m} for p,m in DEFAULT_PLANS.items()]).to_csv(PLANS_FILE,index=False)
+        save_plans(DEFAULT_PLANS)
+
+def file_version(path):
+    # Cheap cache key: changes whenever the file is rewritten, from any session.
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
 
-def load_members():
-    df = pd.read_csv(DATA_FILE,dtype=str)
+def parse_member_dates(df):
     for col in ["Start Date","End Date"]:
         if col in df.columns:
-            df[col] = pd.to_datetime(df[col],errors="coerce").dt.date
+            df[col] = pd.to_datetime(df[col],format=DATE_FORMAT,errors="coerce")
         else:
             df[col] = pd.NaT
     return df
 
-def save_members(df):
-    df = df.copy()
-    for col in ["Start Date","End Date"]:
-        df[col] = df[col].apply(lambda x: x.strftime(DATE_FORMAT) if pd.notna(x) and isinstance(x,date) else (str(x) if pd.notna(x) else ""))
-    df.to_csv(DATA_FILE,index=False)
+@st.cache_data(ttl=300, show_spinner=False)
+def load_members(version, columns=None, plan_names=()):
+    # Parquet stores typed columns, so there is no text or date parsing here,
+    # and `columns` is a file-level projection: unread columns are never decoded.
+    # save_members always writes every MEMBER_COLUMNS entry, so projections are safe.
+    df = pd.read_parquet(DATA_FILE,columns=list(columns) if columns else None)
+    text_cols = [c for c in df.columns if c not in ("Start Date","End Date")]
+    df[text_cols] = df[text_cols].astype(MEMBER_TEXT_DTYPE)
+    # Low-cardinality labels as categoricals: small integer codes, and equality
+    # masks compare codes. Plan categories include plan_names so edits can set
+    # any configured plan without hitting "new category" errors.
+    if "Status" in df.columns:
+        df["Status"] = pd.Categorical(df["Status"], categories=STATUSES)
+    if "Plan Type" in df.columns:
+        plan_categories = sorted(set(plan_names).union(df["Plan Type"].dropna()))
+        df["Plan Type"] = pd.Categorical(df["Plan Type"], categories=plan_categories)
+    # Index by Member ID for hash lookups; unnamed so "Member ID" stays an
+    # unambiguous column label. save_members writes with index=False.
+    if "Member ID" in df.columns:
+        df = df.set_index("Member ID", drop=False).rename_axis(None)
+    return df
 
-def load_plans():
+def save_members(df):
+    # Normalize to a fixed schema: every MEMBER_COLUMNS entry present, dates as
+    # datetime64, everything else as strings (uploads may bring ints or mixed objects)
+    extras = [c for c in df.columns if c not in MEMBER_COLUMNS]
+    df = df.reindex(columns=[*MEMBER_COLUMNS, *extras])
+    for col in df.columns:
+        if col in ("Start Date","End Date"):
+            df[col] = pd.to_datetime(df[col],errors="coerce")
+        else:
+            df[col] = df[col].astype(MEMBER_TEXT_DTYPE)
+    df.to_parquet(DATA_FILE,index=False)
+    load_members.clear()
+
+# cache_resource: one dict shared by every session and rerun (no per-call copy
+# like cache_data makes); callers only read it. The version argument still
+# picks up edits made outside the app, and save_plans clears it explicitly.
+@st.cache_resource(max_entries=1, show_spinner=False)
+def load_plans(version):
     df = pd.read_csv(PLANS_FILE,dtype={"Plan":str,"DurationMonths":int})
     return dict(zip(df["Plan"],df["DurationMonths"]))
 
 def save_plans(plans_dict):
-    pd.DataFrame([{"Plan":p,"DurationMonths":m} for p,m in plans_dict.items()]).to_csv(PLANS_FILE,index=False)
-
-def generate_member_id(df):
-    existing = df.get("Member ID",pd.Series(dtype=str)).dropna().astype(str)
-    nums = [int(v[1:]) for v in existing if v.startswith("M") and v[1:].isdigit()]
-    return f"M{max(nums)+1:04d}" if nums else "M0001"
+    pd.DataFrame({"Plan":list(plans_dict),"DurationMonths":list(plans_dict.values())}).to_csv(PLANS_FILE,index=False)
+    load_plans.clear()
+
+@st.cache_data(show_spinner=False)
+def load_plan_options(version):
+    # Widget options and O(1) name -> position lookups, rebuilt only when plans.csv changes
+    names = tuple(load_plans(version))
+    return names, tuple(sorted(names)), {p: i for i, p in enumerate(names)}
+
+@st.cache_data(max_entries=64, ttl=300, show_spinner=False)
+def search_member_options(version, query):
+    # At most MEMBER_SEARCH_LIMIT {id: label} matches, so pickers never render the whole table
+    df = load_members(version, ("Member ID","Name"))
+    df = df[df["Member ID"].notna()]
+    if query:
+        mask = (
+            df["Member ID"].str.contains(query, case=False, regex=False, na=False)
+            | df["Name"].str.contains(query, case=False, regex=False, na=False)
+        )
+        df = df.loc[mask]
+    df = df.head(MEMBER_SEARCH_LIMIT)
+    return {mid: f"{mid} — {name}" if pd.notna(name) else mid for mid, name in zip(df["Member ID"], df["Name"])}
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def load_member_keys(version):
+    # Lowercased emails and member IDs for duplicate checks, built once per file version
+    df = load_members(version, ("Member ID","Email"))
+    return frozenset(df["Email"].dropna().str.lower()), frozenset(df["Member ID"].dropna())
+
+@st.cache_data(show_spinner=False)
+def next_member_id(version):
+    ids = load_members(version, ("Member ID",)).get("Member ID",pd.Series(dtype=str)).dropna()
+    nums = pd.to_numeric(ids.str.extract(r"^M(\d+)$", expand=False), errors="coerce")
+    return f"M{int(nums.max())+1:04d}" if nums.notna().any() else "M0001"
 
 def refresh_status(df):
-    today = date.today()
     # Ensure End Date is datetime
-    df["End Date"] = pd.to_datetime(df["End Date"], errors='coerce')
-    
-    # Compare using .date()
-    df["Status"] = df["End Date"].apply(
-        lambda end: "Active" if pd.notna(end) and end.date() >= today 
-                    else ("Expired" if pd.notna(end) else "Unknown")
+    end = pd.to_datetime(df["End Date"], errors='coerce')
+    df["End Date"] = end
+
+    # end >= today's midnight is the same test as end.date() >= today
+    has_end = end.notna()
+    status = np.select(
+        [has_end & (end >= pd.Timestamp(date.today())), has_end],
+        ["Active", "Expired"],
+        default="Unknown",
     )
-    return df
+    changed = "Status" not in df.columns or not df["Status"].astype(object).fillna("").eq(status).all()
+    df["Status"] = pd.Categorical(status, categories=STATUSES)
+    return df, changed
 
 
 def plan_end_date(start,plan,plans):
@@ -72,26 +160,163 @@ def plan_end_date(start,plan,plans):
     day = min(start.day,28)
     return date(year,month,day)
 
+def retention_trend(starts, ends, months):
+    # Counts at each month-end m come from binary searches over sorted dates:
+    # total = started on or before m; a member stops being active from
+    # max(start, end + 1ns) on (from start if there is no end date).
+    inactive_from = (ends + pd.Timedelta(1, "ns")).where(lambda e: e > starts, starts)
+    started = np.sort(starts.dropna().to_numpy())
+    inactive = np.sort(inactive_from.dropna().to_numpy())
+    points = months.to_numpy()
+    total = np.searchsorted(started, points, side="right")
+    active = total - np.searchsorted(inactive, points, side="right")
+    retention = np.divide(active * 100, total, out=np.zeros(len(points)), where=total > 0)
+    churn = np.where(total > 0, 100 - retention, 0)
+    return pd.DataFrame({"month": months, "Retention": retention, "Churn": churn})
+
+def filter_members(df, search, status_filter, plan_filter):
+    # AND every active filter into one mask and index once; with no filter the
+    # frame is returned as-is (callers only sort/serialize it, never mutate it)
+    if not search and status_filter == "All" and plan_filter == "All":
+        return df
+    mask = pd.Series(True, index=df.index)
+    if search:
+        mask &= (
+            df['Name'].str.contains(search, case=False, regex=False, na=False)
+            | df['Email'].str.contains(search, case=False, regex=False, na=False)
+            | df['Phone'].str.contains(search, case=False, regex=False, na=False)
+        )
+    if status_filter != "All":
+        mask &= df['Status'] == status_filter
+    if plan_filter != "All":
+        mask &= df['Plan Type'] == plan_filter
+    return df.loc[mask]
+
+@st.cache_data(max_entries=32, ttl=300, show_spinner=False)
+def filtered_members_csv(version, plan_names, search, status_filter, plan_filter):
+    # Keyed on the filter inputs, so a hit is O(1) instead of re-serializing per rerun
+    df_view = filter_members(load_members(version, plan_names=plan_names), search, status_filter, plan_filter)
+    return df_view.to_csv(index=False).encode('utf-8')
+
+@st.cache_data(show_spinner=False)
+def load_dashboard_kpis(version, today):
+    df = load_members(version, SUMMARY_COLUMNS)
+    counts = df["Status"].value_counts()
+    new_signup = df["Start Date"].dt.to_period("M") == pd.Period(today, "M")
+    total = len(df)
+    active = int(counts.get("Active", 0))
+    return {
+        "total": total,
+        "active": active,
+        "expired": int(counts.get("Expired", 0)),
+        "unknown": int(counts.get("Unknown", 0)),
+        "retention_rate": (active / total * 100) if total else 0,
+        "new_signups": int(new_signup.sum()),
+    }
+
+@st.cache_data(show_spinner=False)
+def load_dashboard_aggs(version, today):
+    # Chart inputs only change with the data (or the date), not with every rerun
+    df = load_members(version, SUMMARY_COLUMNS)
+    plan_counts = (
+        df["Plan Type"]
+        .value_counts()
+        .rename_axis("Plan")
+        .reset_index(name="Count")
+    )
+
+    # Monthly renewals (last 12 months)
+    last_12 = today - timedelta(days=365)
+    df_ends = pd.DataFrame({"end": df["End Date"]})
+    df_ends = df_ends[df_ends["end"] >= pd.Timestamp(last_12)]
+    df_ends["month"] = df_ends["end"].dt.to_period("M").dt.to_timestamp()
+    monthly = df_ends.groupby("month", observed=True).size().reset_index(name="Count")
+
+    months = pd.date_range(start=last_12, end=today, freq="M")
+    retention = retention_trend(df["Start Date"], df["End Date"], months)
+    return {"plan_counts": plan_counts, "monthly": monthly, "retention": retention}
+
+@st.cache_data(max_entries=2, show_spinner=False)
+def load_expiring_soon(version, today, plan_names):
+    # Same load_members arguments as the module-level load, so both share one cache entry
+    df = load_members(version, plan_names=plan_names)
+    soon = today + timedelta(days=30)
+    # Still-running memberships ending within 30 days; NaT is never between
+    expiring_soon = df[df["End Date"].between(pd.Timestamp(today), pd.Timestamp(soon), inclusive="both")]
+    return expiring_soon.sort_values("End Date", na_position='last').reset_index(drop=True)
+
+# Chart specs are built once per process; each rerun only attaches fresh data
+# with .properties(data=...), which returns a copy and leaves the cached spec alone.
+@st.cache_resource(show_spinner=False)
+def plan_chart_spec():
+    return (
+        alt.Chart()
+        .mark_bar(color="#4C78A8")
+        .encode(
+            x=alt.X("Plan:N", sort="-y", title="Plan Type"),
+            y=alt.Y("Count:Q", title="Members"),
+            tooltip=["Plan", "Count"]
+        )
+    )
+
+@st.cache_resource(show_spinner=False)
+def renewals_chart_spec():
+    return (
+        alt.Chart()
+        .mark_line(point=True, color="#F58518")
+        .encode(
+            x=alt.X("month:T", title="Month"),
+            y=alt.Y("Count:Q", title="Renewals"),
+            tooltip=["month", "Count"]
+        )
+    )
+
+@st.cache_resource(show_spinner=False)
+def retention_chart_spec():
+    return (
+        alt.Chart()
+        .transform_fold(["Retention", "Churn"], as_=["Metric", "Value"])
+        .mark_line(point=True)
+        .encode(
+            x=alt.X("month:T", title="Month"),
+            y=alt.Y("Value:Q", title="Percentage"),
+            color=alt.Color(
+                "Metric:N",
+                scale=alt.Scale(
+                    domain=["Retention", "Churn"],
+                    range=["#54A24B", "#E45756"]
+                )
+            ),
+            tooltip=["month:T", "Metric:N", alt.Tooltip("Value:Q", format=".1f")]
+        )
+    )
+
 # -------------------------
 # Load data
 # -------------------------
 ensure_files_exist()
-members = load_members()
-plans = load_plans()
-members = refresh_status(members)
-save_members(members)
+plans_version = file_version(PLANS_FILE)
+plans = load_plans(plans_version)
+plan_names, plan_names_sorted, plan_index = load_plan_options(plans_version)
+members = load_members(file_version(DATA_FILE), plan_names=plan_names)
+members, status_changed = refresh_status(members)
+# Only rewrite the data file when a status actually flipped; an unconditional save
+# would bump the file version and defeat the load cache on every rerun.
+if status_changed:
+    save_members(members)
+members_version = file_version(DATA_FILE)
 
 # -------------------------
 # SESSION STATE INIT
 # -------------------------
 for key in ["member_id", "name", "email", "phone", "start_date", "plan_choice", "notes", "add_member_reset"]:
     if key not in st.session_state:
-        if key == "member_id":
-            st.session_state[key] = generate_member_id(members)
-        elif key == "start_date":
+        # member_id starts blank: add_member_reset is True on a new session, so
+        # the Add Member tab fills in the next ID before its widget renders
+        if key == "start_date":
             st.session_state[key] = date.today()
         elif key == "plan_choice":
-            st.session_state[key] = list(plans.keys())[0] if plans else "Bronze"
+            st.session_state[key] = plan_names[0] if plan_names else "Bronze"
         elif key == "add_member_reset":
             st.session_state[key] = True
         else:
@@ -101,7 +326,7 @@ for key in ["member_id", "name", "email", "phone", "start_date", "plan_choice",
 # Layout tabs
 # -------------------------
 st.title("💼 Membership Tracker — Business Edition")
-st.markdown("Manage members, renewals, and quick business KPIs — uses CSV files for storage.")
+st.markdown("Manage members, renewals, and quick business KPIs — stores members in Parquet and plans in CSV.")
 tabs = st.tabs(["🏠 Dashboard","👥 Members","➕ Add Member","🔁 Renew / Edit","⚙️ Settings"])
 
 # -------------------------
@@ -113,31 +338,16 @@ with tabs[0]:
     # --- Top KPI Metrics ---
     col1, col2, col3, col4, col5, col6 = st.columns(6)
 
-    total = len(members)
-    active = len(members[members["Status"] == "Active"]) if total else 0
-    expired = len(members[members["Status"] == "Expired"]) if total else 0
-    unknown = len(members[members["Status"] == "Unknown"]) if total else 0
-    retention_rate = (active / total * 100) if total else 0
-
-    # New signups this month
     today = date.today()
-    if not members.empty:
-        start_dates = pd.to_datetime(members["Start Date"], errors="coerce").dt.date
-        this_month = members[
-            (start_dates.notna())
-            & (pd.Series(start_dates).apply(lambda d: d.month) == today.month)
-            & (pd.Series(start_dates).apply(lambda d: d.year) == today.year)
-        ]
-        new_signups = len(this_month)
-    else:
-        new_signups = 0
+    kpis = load_dashboard_kpis(members_version, today)
+    aggs = load_dashboard_aggs(members_version, today)
 
-    col1.metric("👥 Total Members", total)
-    col2.metric("✅ Active", active)
-    col3.metric("⏳ Expired", expired)
-    col4.metric("❓ Unknown", unknown)
-    col5.metric("📈 Retention Rate", f"{retention_rate:.1f}%")
-    col6.metric("🆕 New Signups", new_signups)
+    col1.metric("👥 Total Members", kpis["total"])
+    col2.metric("✅ Active", kpis["active"])
+    col3.metric("⏳ Expired", kpis["expired"])
+    col4.metric("❓ Unknown", kpis["unknown"])
+    col5.metric("📈 Retention Rate", f"{kpis['retention_rate']:.1f}%")
+    col6.metric("🆕 New Signups", kpis["new_signups"])
 
     st.divider()
 
@@ -145,44 +355,14 @@ with tabs[0]:
     st.subheader("📈 Quick Charts")
     c1, c2 = st.columns([1, 2])
 
-    if not members.empty:
+    if kpis["total"]:
         # Plan type chart
-        plan_counts = (
-            members["Plan Type"]
-            .value_counts()
-            .rename_axis("Plan")
-            .reset_index(name="Count")
-        )
-        chart1 = (
-            alt.Chart(plan_counts)
-            .mark_bar(color="#4C78A8")
-            .encode(
-                x=alt.X("Plan:N", sort="-y", title="Plan Type"),
-                y=alt.Y("Count:Q", title="Members"),
-                tooltip=["Plan", "Count"]
-            )
-        )
+        chart1 = plan_chart_spec().properties(data=aggs["plan_counts"])
         c1.altair_chart(chart1, use_container_width=True)
 
         # Monthly renewals (last 12 months)
-        last_12 = today - timedelta(days=365)
-        end_dates = pd.to_datetime(members["End Date"], errors="coerce")
-        df_ends = pd.DataFrame({"end": end_dates})
-        df_ends = df_ends[df_ends["end"] >= pd.Timestamp(last_12)]
-
-        if not df_ends.empty:
-            df_ends["month"] = df_ends["end"].dt.to_period("M").dt.to_timestamp()
-            monthly = df_ends.groupby("month").size().reset_index(name="Count")
-
-            chart2 = (
-                alt.Chart(monthly)
-                .mark_line(point=True, color="#F58518")
-                .encode(
-                    x=alt.X("month:T", title="Month"),
-                    y=alt.Y("Count:Q", title="Renewals"),
-                    tooltip=["month", "Count"]
-                )
-            )
+        if not aggs["monthly"].empty:
+            chart2 = renewals_chart_spec().properties(data=aggs["monthly"])
             c2.altair_chart(chart2, use_container_width=True)
         else:
             c2.info("ℹ️ No renewal data in the last 12 months.")
@@ -194,42 +374,11 @@ with tabs[0]:
 
     # --- Retention & Churn Trend ---
     st.subheader("📊 Retention & Churn Trend (Last 12 Months)")
-    if not members.empty:
-        members["Start Date"] = pd.to_datetime(members["Start Date"], errors="coerce")
-        members["End Date"] = pd.to_datetime(members["End Date"], errors="coerce")
-
-        last_12 = today - timedelta(days=365)
-        months = pd.date_range(start=last_12, end=today, freq="M")
-        retention_data = []
-        for m in months:
-            total_at_month = members[members["Start Date"] <= m].shape[0]
-            active_at_month = members[
-                (members["Start Date"] <= m) & (members["End Date"] >= m)
-            ].shape[0]
-            retention_pct = (active_at_month / total_at_month * 100) if total_at_month else 0
-            churn_pct = 100 - retention_pct if total_at_month else 0
-            retention_data.append({"month": m, "Retention": retention_pct, "Churn": churn_pct})
-
-        df_retention = pd.DataFrame(retention_data)
+    if kpis["total"]:
+        df_retention = aggs["retention"]
 
         if not df_retention.empty:
-            chart3 = (
-                alt.Chart(df_retention)
-                .transform_fold(["Retention", "Churn"], as_=["Metric", "Value"])
-                .mark_line(point=True)
-                .encode(
-                    x=alt.X("month:T", title="Month"),
-                    y=alt.Y("Value:Q", title="Percentage"),
-                    color=alt.Color(
-                        "Metric:N",
-                        scale=alt.Scale(
-                            domain=["Retention", "Churn"],
-                            range=["#54A24B", "#E45756"]
-                        )
-                    ),
-                    tooltip=["month:T", "Metric:N", alt.Tooltip("Value:Q", format=".1f")]
-                )
-            )
+            chart3 = retention_chart_spec().properties(data=df_retention)
             st.altair_chart(chart3, use_container_width=True)
         else:
             st.info("ℹ️ Not enough data to calculate retention trend.")
@@ -245,43 +394,50 @@ with tabs[1]:
 
     col_filter1, col_filter2, col_filter3 = st.columns([2, 2, 1])
     search = col_filter1.text_input("Search name / email / phone")
-    status_filter = col_filter2.selectbox("Status", options=["All", "Active", "Expired", "Unknown"])
-    plan_filter = col_filter3.selectbox("Plan", options=["All"] + sorted(list(plans.keys())))
+    status_filter = col_filter2.selectbox("Status", options=("All",) + STATUSES)
+    plan_filter = col_filter3.selectbox("Plan", options=("All",) + plan_names_sorted)
 
-    df_view = members.copy()
-    if search:
-        s = search.lower()
-        df_view = df_view[df_view.apply(lambda r: s in str(r['Name']).lower() or s in str(r['Email']).lower() or s in str(r['Phone']).lower(), axis=1)]
-    if status_filter != "All":
-        df_view = df_view[df_view['Status'] == status_filter]
-    if plan_filter != "All":
-        df_view = df_view[df_view['Plan Type'] == plan_filter]
+    df_view = filter_members(members, search, status_filter, plan_filter)
 
-    st.dataframe(df_view.sort_values('End Date').reset_index(drop=True))
+    # Page the table so the browser only renders MEMBERS_PAGE_SIZE rows at a time
+    df_sorted = df_view.sort_values('End Date').reset_index(drop=True)
+    n_pages = max(1, -(-len(df_sorted) // MEMBERS_PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1) if n_pages > 1 else 1
+    first = (page - 1) * MEMBERS_PAGE_SIZE
+    st.dataframe(df_sorted.iloc[first:first + MEMBERS_PAGE_SIZE], column_config=DATE_COLUMN_CONFIG)
+    if n_pages > 1:
+        st.caption(f"Showing {first + 1}–{min(first + MEMBERS_PAGE_SIZE, len(df_sorted))} of {len(df_sorted)} members")
 
     # Export filtered
-    csv = df_view.to_csv(index=False).encode('utf-8')
-    st.download_button("Export filtered CSV", data=csv, file_name="members_filtered.csv", mime='text/csv')
+    export_csv = filtered_members_csv(members_version, plan_names, search, status_filter, plan_filter)
+    st.download_button("Export filtered CSV", data=export_csv, file_name="members_filtered.csv", mime='text/csv')
 
     st.markdown("---")
     st.subheader("Delete a member")
     if not members.empty:
-        to_delete = st.selectbox("Select member to delete (by ID)", options=members['Member ID'].tolist())
-        if st.button("Delete Member"):
-            members = members[members['Member ID'] != to_delete]
-            save_members(members)
-            st.success(f"Member {to_delete} deleted.")
-            st.rerun()
+        delete_query = st.text_input("Find member to delete (ID or name)", key="delete_query")
+        delete_options = search_member_options(members_version, delete_query)
+        if delete_options:
+            to_delete = st.selectbox(
+                "Select member to delete (by ID)",
+                options=list(delete_options),
+                format_func=delete_options.get
+            )
+            if st.button("Delete Member"):
+                members = members.drop(index=to_delete)
+                save_members(members)
+                st.success(f"Member {to_delete} deleted.")
+                st.rerun()
+        else:
+            st.info("No members match your search.")
     else:
         st.info("No members to delete.")
 
     st.subheader("Expiring Soon")
     if not members.empty:
-        soon = date.today() + timedelta(days=30)
-        end_dates = pd.to_datetime(members["End Date"], errors='coerce').dt.date
-        expiring_soon = members[end_dates.notna() & (end_dates <= soon)]
+        expiring_soon = load_expiring_soon(members_version, date.today(), plan_names)
         if not expiring_soon.empty:
-            st.dataframe(expiring_soon.sort_values("End Date", na_position='last').reset_index(drop=True))
+            st.dataframe(expiring_soon, column_config=DATE_COLUMN_CONFIG)
         else:
             st.info("No members expiring in the next 30 days.")
     else:
@@ -296,12 +452,12 @@ with tabs[2]:
         st.session_state['add_member_reset'] = True
 
     if st.session_state['add_member_reset']:
-        st.session_state['member_id'] = generate_member_id(members)
+        st.session_state['member_id'] = next_member_id(members_version)
         st.session_state['name'] = ""
         st.session_state['email'] = ""
         st.session_state['phone'] = ""
         st.session_state['start_date'] = date.today()
-        st.session_state['plan_choice'] = list(plans.keys())[0]
+        st.session_state['plan_choice'] = plan_names[0] if plan_names else "Bronze"
         st.session_state['notes'] = ""
         st.session_state['add_member_reset'] = False
 
@@ -343,8 +499,8 @@ with tabs[2]:
             )
             plan_choice = st.selectbox(
                 "Plan Type",
-                options=list(plans.keys()),
-                index=list(plans.keys()).index(st.session_state['plan_choice']),
+                options=plan_names,
+                index=plan_index.get(st.session_state['plan_choice'], 0),
                 key="plan_choice"
             )
 
@@ -370,12 +526,14 @@ with tabs[2]:
         add_btn = st.button("✅ Add Member", use_container_width=True)
 
         if add_btn:
+            existing_emails, existing_ids = load_member_keys(members_version)
+
             # Validations
             if not member_id.strip() or not name.strip():
                 st.error("⚠️ Member ID and Full Name are required.")
-            elif email.strip() and email.strip().lower() in members['Email'].dropna().str.lower().tolist():
+            elif email.strip() and email.strip().lower() in existing_emails:
                 st.error("⚠️ Email already exists in the system.")
-            elif member_id.strip() in members['Member ID'].astype(str).tolist():
+            elif member_id.strip() in existing_ids:
                 st.error("⚠️ Member ID already exists. Pick another or leave blank to auto-generate.")
             else:
                 new = {
@@ -383,14 +541,13 @@ with tabs[2]:
                     'Name': name.strip(),
                     'Email': email.strip(),
                     'Phone': phone.strip(),
-                    'Start Date': start_date,
-                    'End Date': end_date,
+                    'Start Date': pd.Timestamp(start_date),
+                    'End Date': pd.Timestamp(end_date),
                     'Plan Type': plan_choice,
                     'Status': 'Active' if end_date >= date.today() else 'Expired',
                     'Notes': notes.strip()
                 }
-                members = pd.concat([members, pd.DataFrame([new])], ignore_index=True)
-                save_members(members)
+                save_members(pd.concat([members, pd.DataFrame([new])], ignore_index=True))
                 st.success(f"🎉 Member **{name}** added with ID **{member_id}**.")
 
                 # Reset form
@@ -407,88 +564,96 @@ with tabs[3]:
         st.info("No members available. Add members first.")
     else:
         # Member selector
-        member_id_sel = st.selectbox(
-            "Select Member",
-            options=members['Member ID'].tolist(),
-            help="Choose a member to view and edit details."
-        )
-        sel_row = members[members['Member ID'] == member_id_sel].iloc[0]
-
-        # Current info card
-        st.markdown("### 📋 Current Information")
-        st.dataframe(
-            sel_row[['Member ID', 'Name', 'Email', 'Phone', 'Start Date',
-                     'End Date', 'Plan Type', 'Status', 'Notes']].to_frame().T,
-            use_container_width=True
-        )
-
-        st.divider()
-
-        # Edit form
-        with st.form("edit_member_form"):
-            st.markdown("### ✏️ Edit Details")
-
-            # Split into two columns for cleaner layout
-            col1, col2 = st.columns(2)
-
-            with col1:
-                name = st.text_input("Full Name", value=sel_row['Name'])
-                email = st.text_input("Email", value=sel_row['Email'])
-                phone = st.text_input("Phone", value=sel_row['Phone'])
-                start_date = st.date_input(
-                    "Start Date",
-                    value=sel_row['Start Date'] if pd.notna(sel_row['Start Date']) else date.today()
-                )
-
-            with col2:
-                plan_choice = st.selectbox(
-                    "Plan Type",
-                    options=list(plans.keys()),
-                    index=list(plans.keys()).index(sel_row['Plan Type']) if sel_row['Plan Type'] in plans else 0
-                )
-                end_date = st.date_input(
-                    "End Date",
-                    value=sel_row['End Date'] if pd.notna(sel_row['End Date']) else plan_end_date(start_date, plan_choice, plans)
-                )
-                notes = st.text_area("Notes", value=sel_row.get('Notes', ''))
-
-            st.divider()
-
-            # Quick renew options
-            st.markdown("### ⚡ Quick Renew")
-            col_a, col_b = st.columns([2, 1])
-            with col_a:
-                renew_months = st.number_input(
-                    "Renew for how many months?",
-                    min_value=0, max_value=60, value=0, step=1,
-                    help="Enter number of months to extend membership."
-                )
-            with col_b:
-                apply_quick = st.checkbox("Apply quick renew")
+        edit_query = st.text_input("Find member (ID or name)", key="edit_query")
+        edit_options = search_member_options(members_version, edit_query)
+        if not edit_options:
+            st.info("No members match your search.")
+        else:
+            member_id_sel = st.selectbox(
+                "Select Member",
+                options=list(edit_options),
+                format_func=edit_options.get,
+                help="Choose a member to view and edit details."
+            )
+            # list lookup keeps the first row if an uploaded file repeated an ID
+            sel_row = members.loc[[member_id_sel]].iloc[0]
+
+            # Current info card
+            st.markdown("### 📋 Current Information")
+            st.dataframe(
+                sel_row[['Member ID', 'Name', 'Email', 'Phone', 'Start Date',
+                         'End Date', 'Plan Type', 'Status', 'Notes']].to_frame().T.infer_objects(),
+                column_config=DATE_COLUMN_CONFIG,
+                use_container_width=True
+            )
 
             st.divider()
 
-            # Save button
-            save_btn = st.form_submit_button("💾 Save Changes", use_container_width=True)
-
-            if save_btn:
-                # apply quick renew by adding months to current end_date
-                new_end = end_date
-                if apply_quick and renew_months > 0:
-                    base = sel_row['End Date'] if pd.notna(sel_row['End Date']) else date.today()
-                    year = base.year + (base.month - 1 + renew_months) // 12
-                    month = (base.month - 1 + renew_months) % 12 + 1
-                    day = min(base.day, 28)
-                    new_end = date(year, month, day)
-
-                members.loc[members['Member ID'] == member_id_sel,
-                            ['Name', 'Email', 'Phone', 'Start Date', 'End Date', 'Plan Type', 'Notes']] = [
-                    name, email, phone, start_date, new_end, plan_choice, notes
-                ]
-                members = refresh_status(members)
-                save_members(members)
-                st.success(f"✅ Member **{name}** updated successfully.")
-                st.rerun()
+            # Edit form
+            with st.form("edit_member_form"):
+                st.markdown("### ✏️ Edit Details")
+
+                # Split into two columns for cleaner layout
+                col1, col2 = st.columns(2)
+
+                with col1:
+                    name = st.text_input("Full Name", value=sel_row['Name'] if pd.notna(sel_row['Name']) else "")
+                    email = st.text_input("Email", value=sel_row['Email'] if pd.notna(sel_row['Email']) else "")
+                    phone = st.text_input("Phone", value=sel_row['Phone'] if pd.notna(sel_row['Phone']) else "")
+                    start_date = st.date_input(
+                        "Start Date",
+                        value=sel_row['Start Date'] if pd.notna(sel_row['Start Date']) else date.today()
+                    )
+
+                with col2:
+                    plan_choice = st.selectbox(
+                        "Plan Type",
+                        options=plan_names,
+                        index=plan_index.get(sel_row['Plan Type'], 0)
+                    )
+                    end_date = st.date_input(
+                        "End Date",
+                        value=sel_row['End Date'] if pd.notna(sel_row['End Date']) else plan_end_date(start_date, plan_choice, plans)
+                    )
+                    notes = st.text_area("Notes", value=sel_row['Notes'] if pd.notna(sel_row.get('Notes')) else "")
+
+                st.divider()
+
+                # Quick renew options
+                st.markdown("### ⚡ Quick Renew")
+                col_a, col_b = st.columns([2, 1])
+                with col_a:
+                    renew_months = st.number_input(
+                        "Renew for how many months?",
+                        min_value=0, max_value=60, value=0, step=1,
+                        help="Enter number of months to extend membership."
+                    )
+                with col_b:
+                    apply_quick = st.checkbox("Apply quick renew")
+
+                st.divider()
+
+                # Save button
+                save_btn = st.form_submit_button("💾 Save Changes", use_container_width=True)
+
+                if save_btn:
+                    # apply quick renew by adding months to current end_date
+                    new_end = end_date
+                    if apply_quick and renew_months > 0:
+                        base = sel_row['End Date'] if pd.notna(sel_row['End Date']) else date.today()
+                        year = base.year + (base.month - 1 + renew_months) // 12
+                        month = (base.month - 1 + renew_months) % 12 + 1
+                        day = min(base.day, 28)
+                        new_end = date(year, month, day)
+
+                    members.loc[member_id_sel,
+                                ['Name', 'Email', 'Phone', 'Start Date', 'End Date', 'Plan Type', 'Notes']] = [
+                        name, email, phone, pd.Timestamp(start_date), pd.Timestamp(new_end), plan_choice, notes
+                    ]
+                    members, _ = refresh_status(members)
+                    save_members(members)
+                    st.success(f"✅ Member **{name}** updated successfully.")
+                    st.rerun()
 
 # -------------------------
 # SETTINGS
@@ -500,8 +665,9 @@ with tabs[4]:
     plans_df = pd.DataFrame([{"Plan": p, "DurationMonths": m} for p, m in plans.items()])
     edited = st.data_editor(plans_df, num_rows="dynamic")
     if st.button("Save Plans"):
-        # sanitize and save
-        new_plans = {row['Plan']: int(row['DurationMonths']) for _, row in edited.iterrows()}
+        # sanitize and save; blank rows from the dynamic editor are skipped
+        edited = edited.dropna(subset=['Plan', 'DurationMonths'])
+        new_plans = dict(zip(edited['Plan'].astype(str), edited['DurationMonths'].astype(int)))
         save_plans(new_plans)
         st.success("Plans saved. New plans will be available when adding members.")
         st.rerun()
@@ -509,7 +675,9 @@ with tabs[4]:
     st.markdown("---")
     st.subheader("Manual CSV Management")
     st.write("You can download or upload the members CSV. Use upload cautiously — it will replace current data.")
-    dl = st.download_button("Download members CSV", data=members.to_csv(index=False).encode('utf-8'), file_name="members.csv", mime='text/csv')
+    # Same cache entry as the unfiltered export on the Members tab
+    members_csv = filtered_members_csv(members_version, plan_names, "", "All", "All")
+    dl = st.download_button("Download members CSV", data=members_csv, file_name="members.csv", mime='text/csv')
 
     uploaded = st.file_uploader("Upload a members CSV to replace current dataset", type=["csv"])
     if uploaded is not None:
@@ -523,8 +691,8 @@ with tabs[4]:
             else:
                 # coerce dates
                 for col in ["Start Date", "End Date"]:
-                    new_df[col] = pd.to_datetime(new_df[col], errors='coerce').dt.date
-                new_df = refresh_status(new_df)
+                    new_df[col] = pd.to_datetime(new_df[col], errors='coerce')
+                new_df, _ = refresh_status(new_df)
                 save_members(new_df)
                 st.success("Members CSV replaced successfully.")
                 st.rerun()
@@ -538,4 +706,4 @@ with tabs[4]:
 st.sidebar.markdown("---")
 st.sidebar.write("Data file:\\n" + os.path.abspath(DATA_FILE))
 st.sidebar.write("Plans file:\\n" + os.path.abspath(PLANS_FILE))
-st.sidebar.write("Tips: Back up your CSV files regularly.")
+st.sidebar.write("Tips: Back up your data files regularly.")